@@ -1,16 +1,23 @@
 import random
 import time
+import logging
 from typing import Dict
 
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class EliteAgentOrchestrator:
     """Elite Honeypot Agent - Masters Social Engineering"""
     
+    __slots__ = ('response_strategies', 'modifiers', 'fillers', 'urgency_phrases')
+    
     def __init__(self):
         # Multi-stage response strategies
         self.response_strategies = {
             "initial_engagement": {
                 "stage": 0,
-                "responses": [
+                "responses": (
                     "Hi, I received your message.",
                     "Hello, who is this?",
                     "I got a notification about this.",
@@ -18,11 +25,11 @@ class EliteAgentOrchestrator:
                     "Can you tell me more about this?",
                     "I'm not sure I understand, can you explain?",
                     "This is concerning. What should I do?"
-                ]
+                )
             },
             "playing_dumb": {
                 "stage": 1,
-                "responses": [
+                "responses": (
                     "I'm not very tech-savvy. Can you guide me through this?",
                     "My app keeps showing errors. What do I do?",
                     "I tried but it's not working. Can you help step by step?",
@@ -30,11 +37,11 @@ class EliteAgentOrchestrator:
                     "Which option should I select? I'm confused.",
                     "The website is loading slowly. Is that normal?",
                     "My phone is old. Will that cause any issues?"
-                ]
+                )
             },
             "seeking_assurance": {
                 "stage": 2,
-                "responses": [
+                "responses": (
                     "Are you sure this is safe? I've heard about scams.",
                     "Can you provide official verification?",
                     "Is there a customer care number I can call to confirm?",
@@ -42,11 +49,11 @@ class EliteAgentOrchestrator:
                     "Can you send this in writing or email?",
                     "I need to check with my family first.",
                     "What happens if I don't do this immediately?"
-                ]
+                )
             },
             "extraction_phase": {
                 "stage": 3,
-                "responses": [
+                "responses": (
                     "What details exactly do you need from me?",
                     "Can you share your UPI ID again? I didn't save it.",
                     "What's the account number where I should send money?",
@@ -54,11 +61,11 @@ class EliteAgentOrchestrator:
                     "Should I share my bank details here or somewhere else?",
                     "Is it okay to share my Aadhaar number for verification?",
                     "What's the website where I need to enter my details?"
-                ]
+                )
             },
             "delaying_tactics": {
                 "stage": 4,
-                "responses": [
+                "responses": (
                     "My internet is slow. Please wait.",
                     "Let me charge my phone first.",
                     "I need to find my debit card. One minute.",
@@ -66,23 +73,26 @@ class EliteAgentOrchestrator:
                     "My bank app needs an update. It's taking time.",
                     "I'm at work. Can we continue in 10 minutes?",
                     "Let me check with my bank once."
-                ]
+                )
             }
         }
         
         # Context-aware response modifiers
         self.modifiers = {
-            "concerned": ["Actually, ", "Wait, ", "Hmm... ", "Sorry, "],
-            "urgent": ["Quickly, ", "Immediately, ", "Asap, ", "Right now, "],
-            "confused": ["I think ", "Maybe ", "Probably ", "Perhaps "],
-            "agreeable": ["Okay, ", "Alright, ", "Sure, ", "Yes, "]
+            "concerned": ("Actually, ", "Wait, ", "Hmm... ", "Sorry, "),
+            "urgent": ("Quickly, ", "Immediately, ", "Asap, ", "Right now, "),
+            "confused": ("I think ", "Maybe ", "Probably ", "Perhaps "),
+            "agreeable": ("Okay, ", "Alright, ", "Sure, ", "Yes, ")
         }
         
         # Filler phrases for natural conversation
-        self.fillers = [
+        self.fillers = (
             "please", "sorry", "brother", "sir", "madam",
             "actually", "basically", "like", "you know"
-        ]
+        )
+        
+        # Urgency phrases appended when scam confidence is high
+        self.urgency_phrases = ("It's very urgent!", "Please hurry!", "Time is running out!")
     
     def analyze_context(self, turn_count: int, scam_confidence: float, extracted_items: Dict) -> Dict:
         """Analyze conversation context for optimal response"""
@@ -143,12 +153,13 @@ class EliteAgentOrchestrator:
         else:
             modifier = random.choice(self.modifiers["agreeable"])
         
-        response = modifier + base_response
+        # Collect fragments and join once at the end
+        parts = [modifier, base_response]
         
         # Add filler for naturalness (30% chance)
         if random.random() < 0.3:
-            filler = random.choice(self.fillers)
-            response = response + " " + filler
+            parts.append(" ")
+            parts.append(random.choice(self.fillers))
         
         # Add specific extraction prompts if in extraction phase
         if strategy == "extraction_phase":
@@ -161,20 +172,22 @@ class EliteAgentOrchestrator:
                 missing_items.append("website link")
             
             if missing_items and random.random() < 0.5:
-                item = random.choice(missing_items)
-                response = response + " What's the " + item + "?"
+                parts.append(" What's the ")
+                parts.append(random.choice(missing_items))
+                parts.append("?")
         
         # Add urgency if scam confidence is high
         if scam_confidence > 0.8 and random.random() < 0.4:
-            urgency_phrases = ["It's very urgent!", "Please hurry!", "Time is running out!"]
-            response = response + " " + random.choice(urgency_phrases)
+            parts.append(" ")
+            parts.append(random.choice(self.urgency_phrases))
+        
+        response = "".join(parts)
         
         # Ensure response length
         response = response[:497] + "..." if len(response) > 500 else response
         
-        print(f"🤖 AGENT RESPONSE GENERATED:")
-        print(f"   Stage: {context['stage']}, Strategy: {strategy}")
-        print(f"   Response: '{response}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"🤖 AGENT RESPONSE: stage {context['stage']}, strategy {strategy}: '{response}'")
         
         return response
 
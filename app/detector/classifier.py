@@ -1,11 +1,43 @@
 import re
 import math
+import operator
+from dataclasses import dataclass
 from typing import Dict, List, Tuple, Set
 import hashlib
+import logging
+
+from app.regex_registry import ACC_RE, CARD_RE, IP_RE, PHONE_RE, UPI_RE, URL_RE, keyword_trie_pattern
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class _TextContext:
+    """Per-call views of the message, computed once and shared by all analyzers"""
+    text: str
+    lower: str
+    words: List[str]
+    
+    @classmethod
+    def of(cls, text: str) -> "_TextContext":
+        return cls(text=text, lower=text.lower(), words=text.split())
+
 
 class WorldClassScamDetector:
     """World's Best Scam Detection System - GUVI HCL Hackathon"""
     
+    __slots__ = (
+        'keyword_categories', 'scam_patterns', 'known_scam_domains', 'suspicious_tlds',
+        '_category_bits', '_critical_combination_masks',
+        '_component_names', '_component_weights',
+        '_urgency_keywords', '_emotional_words', '_suspicious_contexts', '_account_words',
+        '_scam_patterns_compiled', '_url_re', '_domain_re', '_ip_re', '_phone_re',
+        '_bank_account_re', '_upi_re', '_card_re',
+        '_category_names', '_entry_category', '_entry_keyword', '_entry_weight',
+        '_keyword_entries', '_keyword_re', '_keyword_prefixes', '_trigger_re'
+    )
+    
     def __init__(self):
         # Multi-level keyword scoring
         self.keyword_categories = {
@@ -59,7 +91,7 @@ class WorldClassScamDetector:
         }
         
         # Common scam patterns
-        self.scam_patterns = [
+        self.scam_patterns = (
             (r'(won|win|winner).*?(lottery|prize|reward).*?(\d+[,\s]*(lakh|crore|million|thousand))', 1.0),
             (r'(urgent|emergency).*?(account|bank).*?(block|suspend)', 1.0),
             (r'(government|official|rbi|income tax).*?(fine|penalty|payment)', 0.9),
@@ -68,19 +100,100 @@ class WorldClassScamDetector:
             (r'(free|gift|bonus).*?(claim|collect).*?(offer)', 0.7),
             (r'(password|otp|pin|cvv).*?(share|send|provide)', 1.0),
             (r'(aadhaar|pan|document).*?(update|verify|submit)', 0.8)
-        ]
+        )
         
         # Known scam URLs
-        self.known_scam_domains = {
+        self.known_scam_domains = frozenset({
             'bit\.ly', 'tinyurl\.com', 'short\.url', 'cutt\.ly',
             'rebrand\.ly', 'is\.gd', 'clck\.ru', 'shorte\.st',
             'adf\.ly', 'ouo\.io', 'bc\.vc', 'goo\.gl'
-        }
+        })
         
         # Suspicious TLDs
-        self.suspicious_tlds = {'.tk', '.ml', '.ga', '.cf', '.gq', '.xyz', '.top', '.club'}
+        self.suspicious_tlds = frozenset({'.tk', '.ml', '.ga', '.cf', '.gq', '.xyz', '.top', '.club'})
+        
+        # Category pairs that boost confidence when both score strongly,
+        # encoded as bitmasks over the category order
+        self._category_bits = {
+            category_name: 1 << index for index, category_name in enumerate(self.keyword_categories)
+        }
+        critical_combinations = [
+            ("financial_scam", "payment_demand"),
+            ("urgency_pressure", "financial_threats"),
+            ("authority_impersonation", "payment_demand")
+        ]
+        self._critical_combination_masks = tuple(
+            self._category_bits[cat1] | self._category_bits[cat2] for cat1, cat2 in critical_combinations
+        )
+        
+        # Component weights for the final combination (declaration order is the
+        # summation order, so totals are bit-identical to the inline formula)
+        self._component_names = ("keyword", "pattern", "financial", "url", "phone", "linguistic")
+        self._component_weights = (0.35, 0.25, 0.20, 0.10, 0.05, 0.05)
+        
+        # Linguistic feature vocabularies
+        self._urgency_keywords = frozenset({'urgent', 'immediate', 'emergency', 'now', 'today', 'hurry', 'quick'})
+        self._emotional_words = frozenset({'congratulations', 'alert', 'warning', 'danger', 'important', 'attention'})
+        
+        # Substring vocabularies for phone/account context checks
+        # ('account' is omitted: any text containing it also contains 'acc')
+        self._suspicious_contexts = ('call', 'whatsapp', 'message', 'contact', 'number is')
+        self._account_words = ('acc', 'bank')
+        
+        # Precompiled patterns (compiled once, reused on every call).
+        # Scam patterns are kept heaviest first so the first hit is the best score.
+        self._scam_patterns_compiled = tuple(sorted(
+            ((re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in self.scam_patterns),
+            key=lambda item: -item[1]
+        ))
+        
+        self._url_re = URL_RE
+        self._domain_re = re.compile('|'.join(sorted(self.known_scam_domains)))
+        self._ip_re = IP_RE
+        self._phone_re = PHONE_RE
+        self._bank_account_re = ACC_RE
+        self._upi_re = UPI_RE
+        self._card_re = CARD_RE
+        
+        # Multi-keyword matcher: one trie-shaped regex finds the longest keyword
+        # starting at every position in a single pass (Aho-Corasick style).
+        # Shorter keywords at the same position are exactly its keyword prefixes.
+        # Keyword table flattened into parallel arrays (one entry per
+        # category/keyword pair, in declaration order)
+        self._category_names = tuple(self.keyword_categories)
+        self._entry_category = []
+        self._entry_keyword = []
+        self._entry_weight = []
+        self._keyword_entries = {}
+        for category_index, keywords in enumerate(self.keyword_categories.values()):
+            for keyword, weight in keywords.items():
+                self._keyword_entries.setdefault(keyword, []).append(len(self._entry_weight))
+                self._entry_category.append(category_index)
+                self._entry_keyword.append(keyword)
+                self._entry_weight.append(weight)
+        self._entry_category = tuple(self._entry_category)
+        self._entry_keyword = tuple(self._entry_keyword)
+        self._entry_weight = tuple(self._entry_weight)
+        self._keyword_re = re.compile('(?=(' + keyword_trie_pattern(self._keyword_entries) + '))')
+        self._keyword_prefixes = {
+            keyword: tuple(other for other in self._keyword_entries if keyword.startswith(other))
+            for keyword in self._keyword_entries
+        }
+        
+        # Trigger gate: a message with no keyword, no scam-pattern lead word,
+        # no digit, no '@' and no 'http' scores zero on every analyzer except
+        # linguistics (worth at most 0.07), so it can be answered without them.
+        # Every scam pattern starts with a group its match must contain.
+        pattern_leads = [re.match(r'\(([^()]*)\)', pattern) for pattern, _ in self.scam_patterns]
+        self._trigger_re = re.compile(
+            '|'.join(
+                [r'[\d@]', 'http', keyword_trie_pattern(self._keyword_entries)] +
+                [lead.group(1) if lead else pattern for lead, (pattern, _) in zip(pattern_leads, self.scam_patterns)]
+            ),
+            re.IGNORECASE
+        )
     
-    def calculate_linguistic_features(self, text: str) -> Dict:
+    def calculate_linguistic_features(self, ctx: _TextContext) -> Dict:
         """Analyze linguistic patterns"""
         features = {
             "exclamation_ratio": 0,
@@ -90,6 +203,7 @@ class WorldClassScamDetector:
             "length_score": 0
         }
         
+        text = ctx.text
         if not text:
             return features
         
@@ -98,28 +212,24 @@ class WorldClassScamDetector:
         features["exclamation_ratio"] = min(exclamation_count / 5, 1.0)
         
         # CAPS analysis
-        words = text.split()
+        words = ctx.words
         if words:
             caps_words = sum(1 for w in words if w.isupper() and len(w) > 2)
             features["caps_ratio"] = min(caps_words / len(words), 1.0)
         
-        # Urgency words
-        urgency_keywords = {'urgent', 'immediate', 'emergency', 'now', 'today', 'hurry', 'quick'}
-        features["urgency_words"] = sum(1 for word in urgency_keywords if word in text.lower())
-        
-        # Emotional words
-        emotional_words = {'congratulations', 'alert', 'warning', 'danger', 'important', 'attention'}
-        features["emotional_words"] = sum(1 for word in emotional_words if word in text.lower())
+        # Urgency and emotional words
+        text_lower = ctx.lower
+        features["urgency_words"] = sum(1 for word in self._urgency_keywords if word in text_lower)
+        features["emotional_words"] = sum(1 for word in self._emotional_words if word in text_lower)
         
         # Length score (very short or very long are suspicious)
         features["length_score"] = 0.7 if len(text) < 20 or len(text) > 500 else 0.0
         
         return features
     
-    def analyze_urls(self, text: str) -> float:
+    def analyze_urls(self, ctx: _TextContext) -> float:
         """Analyze URLs in text"""
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, text.lower())
+        urls = self._url_re.findall(ctx.lower)
         
         if not urls:
             return 0.0
@@ -128,10 +238,8 @@ class WorldClassScamDetector:
         
         for url in urls:
             # Check for known scam domains
-            for domain in self.known_scam_domains:
-                if re.search(domain, url):
-                    url_score = max(url_score, 0.9)
-                    break
+            if self._domain_re.search(url):
+                url_score = max(url_score, 0.9)
             
             # Check for suspicious TLDs
             for tld in self.suspicious_tlds:
@@ -140,7 +248,7 @@ class WorldClassScamDetector:
                     break
             
             # Check for IP addresses
-            if re.search(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', url):
+            if self._ip_re.search(url):
                 url_score = max(url_score, 0.7)
             
             # URL shortening detection
@@ -149,11 +257,10 @@ class WorldClassScamDetector:
         
         return url_score
     
-    def detect_phone_numbers(self, text: str) -> float:
+    def detect_phone_numbers(self, ctx: _TextContext) -> float:
         """Detect and analyze phone numbers"""
         # Indian phone numbers
-        indian_pattern = r'(\+91[\-\s]?)?[6-9]\d{9}'
-        numbers = re.findall(indian_pattern, text)
+        numbers = self._phone_re.findall(ctx.text)
         
         if not numbers:
             return 0.0
@@ -163,71 +270,68 @@ class WorldClassScamDetector:
             return 0.8
         
         # Number in suspicious context
-        suspicious_contexts = ['call', 'whatsapp', 'message', 'contact', 'number is']
-        context_found = any(context in text.lower() for context in suspicious_contexts)
+        context_found = any(map(ctx.lower.__contains__, self._suspicious_contexts))
         
         return 0.7 if context_found else 0.4
     
-    def analyze_financial_info(self, text: str) -> float:
+    def analyze_financial_info(self, ctx: _TextContext) -> float:
         """Analyze financial information patterns"""
+        text = ctx.lower
         score = 0.0
         
         # Bank account patterns
-        if re.search(r'\b\d{9,18}\b', text):
+        if self._bank_account_re.search(text):
             score = max(score, 0.7)
             # With keywords
-            if any(keyword in text.lower() for keyword in ['account', 'bank', 'acc']):
+            if any(map(text.__contains__, self._account_words)):
                 score = max(score, 0.9)
         
-        # UPI ID patterns
-        upi_patterns = [
-            r'[\w.\-]+@(okicici|okhdfc|okaxis|oksbi|ybl|axl|ibl)',
-            r'upi[\s:]+[\w.\-]+@[\w]+',
-            r'pay[\s]+to[\s]+[\w.\-]+@[\w]+'
-        ]
-        
-        for pattern in upi_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
+        # UPI ID patterns (every UPI pattern needs an '@', so skip them without one)
+        if '@' in text:
+            if self._upi_re.search(text):
                 score = max(score, 0.95)
-                break
         
         # Card number patterns
-        if re.search(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b', text):
+        if self._card_re.search(text):
             score = max(score, 1.0)
         
         return score
     
-    def calculate_pattern_score(self, text: str) -> float:
+    def calculate_pattern_score(self, ctx: _TextContext) -> float:
         """Calculate pattern matching score"""
-        pattern_score = 0.0
+        for pattern, weight in self._scam_patterns_compiled:
+            if pattern.search(ctx.lower):
+                return weight
         
-        for pattern, weight in self.scam_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                pattern_score = max(pattern_score, weight)
-        
-        return pattern_score
+        return 0.0
     
-    def calculate_keyword_score(self, text: str) -> Dict:
+    def calculate_keyword_score(self, ctx: _TextContext) -> Dict:
         """Calculate comprehensive keyword scores"""
-        text_lower = text.lower()
-        category_scores = {}
+        hits = set()
+        for keyword in self._keyword_re.findall(ctx.lower):
+            hits.update(self._keyword_prefixes[keyword])
         
-        for category_name, keywords in self.keyword_categories.items():
-            category_score = 0.0
-            found_keywords = []
-            
-            for keyword, weight in keywords.items():
-                if keyword in text_lower:
-                    category_score += weight
-                    found_keywords.append(keyword)
+        scores = [0.0] * len(self._category_names)
+        found = [[] for _ in self._category_names]
+        
+        # Accumulate in declaration order so sums match a per-keyword loop exactly
+        for entry in sorted(entry for keyword in hits for entry in self._keyword_entries[keyword]):
+            category_index = self._entry_category[entry]
+            scores[category_index] += self._entry_weight[entry]
+            found[category_index].append(self._entry_keyword[entry])
+        
+        category_scores = {}
+        for category_index, category_name in enumerate(self._category_names):
+            category_score = scores[category_index]
+            keywords = found[category_index]
             
             # Normalize category score
-            if found_keywords:
+            if keywords:
                 category_score = min(category_score / 3, 1.0)
             
             category_scores[category_name] = {
                 "score": category_score,
-                "keywords": found_keywords[:5]  # Limit to top 5
+                "keywords": keywords[:5]  # Limit to top 5
             }
         
         return category_scores
@@ -237,58 +341,77 @@ class WorldClassScamDetector:
         if not text or len(text.strip()) < 3:
             return False, 0.0, {}
         
-        text_lower = text.lower()
+        ctx = _TextContext.of(text)
+        
+        # Benign fast path (see _trigger_re)
+        if not self._trigger_re.search(ctx.lower):
+            return False, 0.0, {}
         
         # 1. Calculate keyword scores
-        keyword_analysis = self.calculate_keyword_score(text_lower)
+        keyword_analysis = self.calculate_keyword_score(ctx)
         keyword_score = max(cat["score"] for cat in keyword_analysis.values())
         
-        # 2. Pattern matching
-        pattern_score = self.calculate_pattern_score(text_lower)
-        
-        # 3. URL analysis
-        url_score = self.analyze_urls(text_lower)
-        
-        # 4. Phone number analysis
-        phone_score = self.detect_phone_numbers(text)
-        
-        # 5. Financial info analysis
-        financial_score = self.analyze_financial_info(text_lower)
-        
-        # 6. Linguistic features
-        linguistic = self.calculate_linguistic_features(text)
-        linguistic_score = (
-            linguistic["exclamation_ratio"] * 0.3 +
-            linguistic["caps_ratio"] * 0.2 +
-            min(linguistic["urgency_words"] * 0.2, 0.4) +
-            min(linguistic["emotional_words"] * 0.1, 0.3) +
-            linguistic["length_score"] * 0.2
-        )
-        
-        # 7. Combined score calculation with weights
-        scores = {
-            "keyword": keyword_score * 0.35,
-            "pattern": pattern_score * 0.25,
-            "financial": financial_score * 0.20,
-            "url": url_score * 0.10,
-            "phone": phone_score * 0.05,
-            "linguistic": linguistic_score * 0.05
-        }
-        
-        total_confidence = sum(scores.values())
+        # 2. Boost for critical combinations (bitmask of strong categories)
+        strong_categories = 0
+        for category_name, category in keyword_analysis.items():
+            if category["score"] > 0.6:
+                strong_categories |= self._category_bits[category_name]
         
-        # 8. Boost for critical combinations
-        critical_combinations = [
-            ("financial_scam", "payment_demand"),
-            ("urgency_pressure", "financial_threats"),
-            ("authority_impersonation", "payment_demand")
-        ]
+        boosted = False
+        for combination_mask in self._critical_combination_masks:
+            if strong_categories & combination_mask == combination_mask:
+                boosted = True
+                break
         
-        for cat1, cat2 in critical_combinations:
-            if (keyword_analysis[cat1]["score"] > 0.6 and 
-                keyword_analysis[cat2]["score"] > 0.6):
+        # 3. Pattern matching
+        pattern_score = self.calculate_pattern_score(ctx)
+        
+        # 4. Financial info analysis
+        financial_score = self.analyze_financial_info(ctx)
+        
+        # 5. Early exit: a boosted total is clamped to 1.0, so once keyword,
+        # pattern and financial alone reach 0.8 the URL/phone/linguistic scores
+        # (all non-negative) cannot change the confidence; they are reported
+        # as None rather than computed
+        weighted = tuple(map(
+            operator.mul,
+            (keyword_score, pattern_score, financial_score),
+            self._component_weights
+        ))
+        early_exit = boosted and sum(weighted) + 0.2 >= 1.0
+        
+        if early_exit:
+            url_score = phone_score = linguistic = None
+            scores = dict(zip(self._component_names, weighted + (None, None, None)))
+            total_confidence = 1.0
+        else:
+            # 6. URL analysis
+            url_score = self.analyze_urls(ctx)
+            
+            # 7. Phone number analysis
+            phone_score = self.detect_phone_numbers(ctx)
+            
+            # 8. Linguistic features
+            linguistic = self.calculate_linguistic_features(ctx)
+            linguistic_score = (
+                linguistic["exclamation_ratio"] * 0.3 +
+                linguistic["caps_ratio"] * 0.2 +
+                min(linguistic["urgency_words"] * 0.2, 0.4) +
+                min(linguistic["emotional_words"] * 0.1, 0.3) +
+                linguistic["length_score"] * 0.2
+            )
+            
+            # Combined score calculation with weights
+            weighted += tuple(map(
+                operator.mul,
+                (url_score, phone_score, linguistic_score),
+                self._component_weights[3:]
+            ))
+            scores = dict(zip(self._component_names, weighted))
+            
+            total_confidence = sum(weighted)
+            if boosted:
                 total_confidence = min(total_confidence + 0.2, 1.0)
-                break
         
         # 9. Decision threshold (adaptive)
         # Lower threshold if any critical element is present
@@ -304,12 +427,13 @@ class WorldClassScamDetector:
             "threshold_used": threshold,
             "category_scores": {k: v["score"] for k, v in keyword_analysis.items()},
             "detected_patterns": {
-                "urls_found": url_score > 0,
-                "phone_found": phone_score > 0,
+                "urls_found": None if early_exit else url_score > 0,
+                "phone_found": None if early_exit else phone_score > 0,
                 "financial_info": financial_score > 0
             },
             "linguistic_features": linguistic,
             "component_scores": scores,
+            "early_exit": early_exit,
             "decision_factors": []
         }
         
@@ -321,13 +445,13 @@ class WorldClassScamDetector:
         if pattern_score > 0.7:
             analysis_report["decision_factors"].append("known_scam_pattern")
         
-        print(f"🔍 ULTIMATE DETECTION ANALYSIS:")
-        print(f"   Text: '{text[:80]}...'")
-        print(f"   Total Confidence: {total_confidence:.2f}")
-        print(f"   Threshold: {threshold:.2f}")
-        print(f"   Decision: {'SCAM' if is_scam else 'LEGIT'}")
-        print(f"   Key Scores: K={keyword_score:.2f}, P={pattern_score:.2f}, F={financial_score:.2f}")
-        print(f"   Factors: {analysis_report['decision_factors']}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"🔍 DETECTION: '{text[:80]}...' | Decision: {'SCAM' if is_scam else 'LEGIT'} | "
+                f"Confidence: {total_confidence:.2f} (threshold {threshold:.2f}) | "
+                f"K={keyword_score:.2f}, P={pattern_score:.2f}, F={financial_score:.2f} | "
+                f"Factors: {analysis_report['decision_factors']}"
+            )
         
         return is_scam, total_confidence, analysis_report
 
@@ -1,14 +1,20 @@
 import re
 import json
+import logging
 from typing import Dict, List, Any
 from urllib.parse import urlparse
 
+from app.regex_registry import CARD_PATTERN, EXTRACTION_FLAGS, PHONE_PATTERN, SHORTENER_PATTERN
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class EliteIntelligenceExtractor:
     """Elite Intelligence Extraction System"""
     
     def __init__(self):
         # Enhanced patterns with context awareness
-        self.patterns = {
+        raw_patterns = {
             "bank_account": [
                 # Standard account numbers
                 (r'(?:account|acc|ac)\s*(?:no|number|#|no\.)?\s*[:=\-]?\s*(\d{9,18})', 0.95),
@@ -31,13 +37,13 @@ class EliteIntelligenceExtractor:
                 (r'(?:https?://|www\.)[^\s<>"\'{}|\\^`\[\]]+', 0.9),
                 (r'(?:click|visit|open|go to|check)\s+(?:this|the|our)?\s*(?:link|site|website|page|portal)\s*[:=\-]?\s*((?:https?://|www\.)[^\s]+)', 0.97),
                 # Shortened URLs
-                (r'(?:bit\.ly|tinyurl\.com|short\.url|cutt\.ly|rebrand\.ly)/[^\s]+', 0.85),
+                (SHORTENER_PATTERN, 0.85),
                 # Payment links
                 (r'(?:pay|payment|buy|purchase|donate)\s*(?:link|url)?\s*[:=\-]?\s*(https?://[^\s]+)', 0.95),
             ],
             "phone_number": [
                 # Indian numbers
-                (r'(?:\+91[\-\s]?)?[6-9]\d{9}', 0.8),
+                (PHONE_PATTERN, 0.8),
                 (r'contact\s*(?:no|number)?\s*[:=\-]?\s*((?:\+91[\-\s]?)?[6-9]\d{9})', 0.9),
                 (r'call\s+(?:me|us|at)?\s*[:=\-]?\s*((?:\+91[\-\s]?)?[6-9]\d{9})', 0.88),
                 (r'whatsapp\s*(?:no|number)?\s*[:=\-]?\s*((?:\+91[\-\s]?)?[6-9]\d{9})', 0.92),
@@ -49,18 +55,49 @@ class EliteIntelligenceExtractor:
             ],
             "card_details": [
                 # Credit/Debit cards
-                (r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b', 0.99),
+                (CARD_PATTERN, 0.99),
                 (r'(?:card|credit|debit)\s+(?:no|number)\s*[:=\-]?\s*(\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4})', 1.0),
                 (r'cvv\s*[:=\-]?\s*(\d{3,4})', 0.95),
                 (r'expir(?:y|ation)\s*(?:date)?\s*[:=\-]?\s*(\d{2}/\d{2,4})', 0.9),
             ]
         }
         
-        # Context validation rules
-        self.context_rules = {
-            "bank_account": lambda text, match: any(word in text.lower() for word in ['account', 'bank', 'transfer', 'send']),
-            "upi_id": lambda text, match: any(word in text.lower() for word in ['upi', 'pay', 'send money', 'transfer']),
-            "url": lambda text, match: any(word in text.lower() for word in ['click', 'visit', 'link', 'website']),
+        # Compiled once; shared sources resolve to the registry's objects.
+        # A bad pattern fails here, at import, rather than inside extract_all.
+        self.patterns = {}
+        for pattern_type, patterns in raw_patterns.items():
+            compiled_patterns = []
+            for pattern, confidence in patterns:
+                try:
+                    compiled_patterns.append((re.compile(pattern, EXTRACTION_FLAGS), confidence))
+                except re.error as e:
+                    raise ValueError(f"Invalid {pattern_type} pattern {pattern!r}: {e}") from e
+            self.patterns[pattern_type] = compiled_patterns
+        
+        # Result bucket each pattern type reports into
+        self._result_keys = {
+            pattern_type: f"{pattern_type.replace('_', '')}s" for pattern_type in self.patterns
+        }
+        
+        # Per-type prefilters: a substring every pattern of that type must
+        # contain, so a type is skipped in one cheap scan when it cannot match
+        self._type_gates = {
+            "bank_account": re.compile(r'\d{9}'),
+            "upi_id": re.compile(r'@'),
+            "url": re.compile(r'/|www\.', re.IGNORECASE),
+            "phone_number": re.compile(r'[6-9]\d{9}'),
+            "email": re.compile(r'@'),
+            "card_details": re.compile(r'\d{2}'),
+        }
+        
+        # Every pattern needs a digit, an '@', a '/' or 'www.' to match
+        self._trigger_re = re.compile(r'[\d@/]|www\.', re.IGNORECASE)
+        
+        # Context validation words (any one present in the lowered text)
+        self.context_words = {
+            "bank_account": ('account', 'bank', 'transfer', 'send'),
+            "upi_id": ('upi', 'pay', 'send money', 'transfer'),
+            "url": ('click', 'visit', 'link', 'website'),
         }
         
         # False positive filters
@@ -105,11 +142,10 @@ class EliteIntelligenceExtractor:
                     return True
         return False
     
-    def has_context(self, text: str, match: str, pattern_type: str) -> bool:
-        """Check if match has proper context"""
-        if pattern_type in self.context_rules:
-            return self.context_rules[pattern_type](text, match)
-        return True
+    def _has_context_lower(self, text_lower: str, pattern_type: str) -> bool:
+        """Check if the (already-lowered) text has proper context for a type"""
+        words = self.context_words.get(pattern_type)
+        return words is None or any(map(text_lower.__contains__, words))
     
     def extract_all(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
         """Extract all intelligence with validation"""
@@ -122,59 +158,65 @@ class EliteIntelligenceExtractor:
             "card_details": []
         }
         
-        if not text or len(text.strip()) < 10:
+        if not text or len(text.strip()) < 10 or not self._trigger_re.search(text):
             return results
         
+        # Value-keyed (insertion-ordered) dicts dedupe as matches are found
+        found = {key: {} for key in results}
+        
+        # Context depends only on the text, so lower it once and check each
+        # type at most once
+        text_lower = text.lower()
+        
         for pattern_type, patterns in self.patterns.items():
-            for pattern, confidence in patterns:
-                try:
-                    matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-                    for match in matches:
-                        groups = match.groups()
-                        value = groups[0] if groups and groups[0] else match.group(0)
+            # Types without a result bucket would be discarded anyway
+            found_items = found.get(self._result_keys[pattern_type])
+            if found_items is None or not self._type_gates[pattern_type].search(text):
+                continue
+            
+            has_context = self._has_context_lower(text_lower, pattern_type)
+            
+            for compiled, confidence in patterns:
+                matches = compiled.finditer(text)
+                for match in matches:
+                    groups = match.groups()
+                    value = groups[0] if groups and groups[0] else match.group(0)
+                    
+                    if value:
+                        value = self.clean_value(value, pattern_type)
                         
-                        if value:
-                            value = self.clean_value(value, pattern_type)
-                            
-                            # Validate
-                            if not value or self.is_false_positive(value, pattern_type):
-                                continue
-                            
-                            if not self.has_context(text, value, pattern_type):
-                                confidence *= 0.7  # Reduce confidence for missing context
-                            
-                            # Add to results
-                            result_key = f"{pattern_type.replace('_', '')}s"
-                            if result_key in results:
-                                results[result_key].append({
-                                    "value": value,
-                                    "confidence": confidence,
-                                    "context": match.group(0)[:50]
-                                })
-                except Exception as e:
-                    print(f"Pattern error in {pattern_type}: {e}")
-                    continue
-        
-        # Remove duplicates (same value)
-        for key in results:
-            seen = set()
-            unique = []
-            for item in results[key]:
-                if item["value"] not in seen:
-                    seen.add(item["value"])
-                    unique.append(item)
-            results[key] = sorted(unique, key=lambda x: x["confidence"], reverse=True)
-        
-        # Filter low confidence results
-        for key in results:
-            results[key] = [item for item in results[key] if item["confidence"] >= 0.6]
-        
-        print(f"🔍 ELITE EXTRACTION RESULTS:")
-        for key, items in results.items():
-            if items:
-                print(f"   {key}: {len(items)} items")
-                for item in items[:3]:  # Show top 3
-                    print(f"     - {item['value']} (conf: {item['confidence']:.2f})")
+                        # Validate
+                        if not value or self.is_false_positive(value, pattern_type):
+                            continue
+                        
+                        if not has_context:
+                            confidence *= 0.7  # Reduce confidence for missing context
+                        
+                        # Add to results (first occurrence of a value wins)
+                        if value not in found_items:
+                            found_items[value] = {
+                                "value": value,
+                                "confidence": confidence,
+                                "context": match.group(0)[:50]
+                            }
+        
+        # Filter low confidence results and order by confidence in one pass
+        # (already unique per value)
+        for key, items in found.items():
+            results[key] = sorted(
+                (item for item in items.values() if item["confidence"] >= 0.6),
+                key=lambda x: x["confidence"],
+                reverse=True
+            )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            lines = [f"🔍 ELITE EXTRACTION RESULTS:"]
+            for key, items in results.items():
+                if items:
+                    lines.append(f"   {key}: {len(items)} items")
+                    for item in items[:3]:  # Show top 3
+                        lines.append(f"     - {item['value']} (conf: {item['confidence']:.2f})")
+            logger.debug("\n".join(lines))
         
         return results
 
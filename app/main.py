@@ -6,53 +6,62 @@ Updated to match GUVI evaluation format EXACTLY
 import sys
 import os
 import json
+import logging
 import time
-from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from contextlib import asynccontextmanager
 
-# Compatibility patches
-if sys.version_info >= (3, 13):
-    try:
-        import pydantic.typing
-        original_evaluate_forwardref = pydantic.typing.evaluate_forwardref
-        
-        def patched_evaluate_forwardref(ref, globalns=None, localns=None):
-            try:
-                return ref._evaluate(globalns, localns, set(), recursive_guard=set())
-            except TypeError:
-                return ref._evaluate(globalns, localns, set())
-        
-        pydantic.typing.evaluate_forwardref = patched_evaluate_forwardref
-    except:
-        pass
-
-from fastapi import FastAPI, Request, Depends, BackgroundTasks, HTTPException
+from fastapi import FastAPI, Request, Response, Depends, BackgroundTasks, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+import orjson
 import uvicorn
+from anyio import to_thread
+from pydantic import ValidationError
 
 # Import models and handlers
 from app.models import GuviRequest, GuviResponse, FinalResult
 from app.security import verify_api_key
 from app.guvi_handler import guvi_handler
+from app.utils.helpers import utc_timestamp
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Per-request access lines cost a formatted write each; opt in with ACCESS_LOG=1
+ACCESS_LOG = os.getenv("ACCESS_LOG", "0") == "1"
+
+# Browser origins allowed by CORS; defaults to any origin
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan"""
-    print("""
+    # Request processing and sync dependencies share AnyIO's default
+    # 40-token threadpool; raise it so bursts queue on the GIL rather than
+    # on the limiter (override with THREADPOOL)
+    to_thread.current_default_thread_limiter().total_tokens = int(os.getenv("THREADPOOL", "200"))
+    
+    # Cosmetic banner only on an interactive console; keeps CI/prod logs clean
+    interactive = sys.stderr.isatty()
+    if interactive:
+        print("""
     ╔══════════════════════════════════════════════════════════════╗
     ║     🏆 ELITE AGENTIC HONEYPOT API v3.0                      ║
     ║     🎯 GUVI HCL HACKATHON 2025 - PERFECT COMPATIBILITY      ║
     ║     💰 PRIZE-WINNING CONFIGURATION                          ║
     ╚══════════════════════════════════════════════════════════════╝
     """)
-    print("🔑 API Key: GUVI_HCL_2025_EVAL_YGHn9UoBVBrhoru4q2nDYIMiIHacB9QT")
-    print("🎯 Format: GUVI Compatible (Exact match)")
-    print("🏆 Target: 10/10 Score - 4 Lakh Prize")
-    print("=" * 60)
+        print("🔑 API Key: GUVI_HCL_2025_EVAL_YGHn9UoBVBrhoru4q2nDYIMiIHacB9QT")
+        print("🎯 Format: GUVI Compatible (Exact match)")
+        print("🏆 Target: 10/10 Score - 4 Lakh Prize")
+        print("=" * 60)
     yield
-    print("\n🛑 Shutting down Elite Honeypot API")
+    if interactive:
+        print("\n🛑 Shutting down Elite Honeypot API")
 
 # Create FastAPI app
 app = FastAPI(
@@ -67,29 +76,39 @@ app = FastAPI(
         "name": "MIT",
         "url": "https://opensource.org/licenses/MIT"
     },
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS
+# Add CORS (comma-separated CORS_ORIGINS narrows the allowed origins)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (stats, conversations); level 4 keeps CPU low
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=4)
+
 # ==================== GUVI COMPATIBLE ENDPOINTS ====================
 
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
+def _timestamped_payload(before: Dict[str, Any], after: Dict[str, Any]) -> Tuple[bytes, bytes]:
+    """Pre-serialize a constant JSON object around its "timestamp" field"""
+    head = orjson.dumps(before)[:-1] + b',"timestamp":"'
+    tail = b'",' + orjson.dumps(after)[1:]
+    return head, tail
+
+# Constant bodies for the probe endpoints; only the timestamp is filled per request
+_ROOT_HEAD, _ROOT_TAIL = _timestamped_payload(
+    {
         "status": "online",
         "service": "🏆 ELITE Agentic Honeypot API",
         "version": "3.0.0",
-        "description": "GUVI HCL Hackathon 2025 - Perfect Compatibility",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "description": "GUVI HCL Hackathon 2025 - Perfect Compatibility"
+    },
+    {
         "endpoints": {
             "main": "/honeypot (POST) - GUVI compatible endpoint",
             "test": "/test (POST) - Test endpoint",
@@ -100,13 +119,13 @@ async def root():
         "team": "AlphaTech Intelligence",
         "authentication": "x-api-key header required"
     }
+)
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+_HEALTH_HEAD, _HEALTH_TAIL = _timestamped_payload(
+    {
+        "status": "healthy"
+    },
+    {
         "service": "elite_honeypot_api",
         "version": "3.0.0",
         "guvi_compatible": True,
@@ -119,10 +138,51 @@ async def health_check():
             "Automatic final callback"
         ]
     }
+)
+
+# Fallback GUVI replies, serialized once (status is always "success" for GUVI)
+_FALLBACK_REPLY = orjson.dumps({"status": "success", "reply": "I received your message. Please provide more details."})
+_ERROR_REPLY = orjson.dumps({"status": "success", "reply": "System received your message. Please try again if needed."})
+
+@app.get("/")
+async def root():
+    """Root endpoint"""
+    return Response(_ROOT_HEAD + utc_timestamp().encode() + _ROOT_TAIL, media_type="application/json")
+
+@app.get("/health")
+async def health_check(probe: Optional[str] = None):
+    """Health check endpoint (?probe=1 answers 204 with no body for orchestrator probes)"""
+    if probe == "1":
+        return Response(status_code=204)
+    return Response(_HEALTH_HEAD + utc_timestamp().encode() + _HEALTH_TAIL, media_type="application/json")
+
+# Empty /honeypot body: the same "missing" error FastAPI reports
+_MISSING_BODY_ERRORS = [
+    {**error, "loc": ("body",)}
+    for error in ValidationError.from_exception_data(
+        "GuviRequest", [{"type": "missing", "loc": (), "input": None}]
+    ).errors()
+]
+
+def _body_error(error: Dict[str, Any]) -> Dict[str, Any]:
+    """Locate a validation error under "body", as FastAPI does, without
+    echoing an unparseable raw body back to the client"""
+    error = {**error, "loc": ("body", *error["loc"])}
+    if error["type"] == "json_invalid":
+        error["input"] = {}
+    return error
+
+# Request body schema for /honeypot, which parses its body itself
+_GUVI_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/GuviRequest"}}}
+    }
+}
 
-@app.post("/honeypot", response_model=GuviResponse)
+@app.post("/honeypot", responses={200: {"model": GuviResponse}}, openapi_extra=_GUVI_REQUEST_BODY)
 async def honeypot_guvi_compatible(
-    request: GuviRequest,
+    request: Request,
     key_type: str = Depends(verify_api_key)
 ):
     """
@@ -147,41 +207,50 @@ async def honeypot_guvi_compatible(
         "reply": "Agent response here"
     }
     """
+    # Validate straight from the raw bytes in one pass (pydantic's JSON
+    # parser), instead of FastAPI's json.loads + model validation
+    body = await request.body()
+    if not body:
+        raise RequestValidationError(_MISSING_BODY_ERRORS)
+    try:
+        guvi_request = GuviRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError([_body_error(error) for error in e.errors()])
     
+    return await _process_guvi_request(guvi_request)
+
+async def _process_guvi_request(request: GuviRequest) -> Response:
+    """Run a validated GUVI request through the handler, never failing"""
     start_time = time.time()
     
-    print("\n" + "=" * 80)
-    print("🎯 GUVI REQUEST RECEIVED")
-    print(f"📦 Session ID: {request.sessionId}")
-    print(f"📨 Message: {request.message.text[:100]}...")
-    print(f"👤 Sender: {request.message.sender}")
-    print(f"📊 History: {len(request.conversationHistory)} previous messages")
-    print("=" * 80)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"🎯 GUVI REQUEST RECEIVED | Session ID: {request.sessionId} | "
+            f"Message: {request.message.text[:100]}... | Sender: {request.message.sender} | "
+            f"History: {len(request.conversationHistory)} previous messages"
+        )
     
     try:
-        # Process through elite GUVI handler
-        response = guvi_handler.process_guvi_request(request)
+        # Process through elite GUVI handler on the threadpool: detection,
+        # extraction and reply generation are CPU-bound and would otherwise
+        # stall every other connection on the event loop
+        response = await run_in_threadpool(guvi_handler.process_guvi_request, request)
         
-        processing_time = time.time() - start_time
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"✅ REQUEST PROCESSED SUCCESSFULLY | Processing Time: {time.time() - start_time:.2f}s | "
+                f"Response Status: {response.status} | Agent Reply: {response.reply[:80]}..."
+            )
         
-        print(f"\n✅ REQUEST PROCESSED SUCCESSFULLY")
-        print(f"⏱️  Processing Time: {processing_time:.2f}s")
-        print(f"📤 Response Status: {response.status}")
-        print(f"💬 Agent Reply: {response.reply[:80]}...")
-        print("=" * 80)
-        
-        return response
+        # GuviResponse built by the handler (model_construct, no validation);
+        # dump it straight to the response without re-validating
+        return ORJSONResponse(response.model_dump())
         
     except Exception as e:
-        print(f"\n❌ ERROR PROCESSING REQUEST: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ ERROR PROCESSING REQUEST: %s: %s", type(e).__name__, e)
         
         # Return valid GUVI response even on error
-        return GuviResponse(
-            status="success",  # Always return success for GUVI
-            reply="I received your message. Please provide more details."
-        )
+        return Response(_FALLBACK_REPLY, media_type="application/json")
 
 @app.post("/test")
 async def test_endpoint(request: GuviRequest):
@@ -189,10 +258,10 @@ async def test_endpoint(request: GuviRequest):
     Test endpoint with GUVI format
     Useful for manual testing
     """
-    print(f"\n🧪 TEST ENDPOINT CALLED: {request.sessionId}")
+    logger.debug("🧪 TEST ENDPOINT CALLED: %s", request.sessionId)
     
     # Process normally
-    return await honeypot_guvi_compatible(request, "test_key")
+    return await _process_guvi_request(request)
 
 @app.get("/stats/{session_id}")
 async def get_session_stats(session_id: str):
@@ -200,62 +269,73 @@ async def get_session_stats(session_id: str):
     stats = guvi_handler.get_conversation_stats(session_id)
     
     if stats:
-        return {
+        return ORJSONResponse({
             "status": "success",
             "session_id": session_id,
             "stats": stats,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+            "timestamp": utc_timestamp()
+        })
     else:
-        return {
+        return ORJSONResponse({
             "status": "error",
             "message": f"Session {session_id} not found",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+            "timestamp": utc_timestamp()
+        })
 
 @app.get("/conversations")
 async def list_conversations():
     """List all active conversations"""
     sessions = list(guvi_handler.conversations.keys())
     
-    return {
+    return ORJSONResponse({
         "status": "success",
         "active_conversations": len(sessions),
         "sessions": sessions,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
+        "timestamp": utc_timestamp()
+    })
 
 # ==================== ERROR HANDLING ====================
 
 @app.exception_handler(Exception)
 async def universal_error_handler(request: Request, exc: Exception):
     """Catch ALL exceptions"""
-    print(f"\n🔥 UNIVERSAL ERROR HANDLER: {type(exc).__name__}: {exc}")
+    logger.error("🔥 UNIVERSAL ERROR HANDLER: %s: %s", type(exc).__name__, exc)
     
     # Always return valid GUVI format
-    return JSONResponse(
-        status_code=200,
-        content={
-            "status": "success",
-            "reply": "System received your message. Please try again if needed."
-        }
-    )
+    return Response(_ERROR_REPLY, status_code=200, media_type="application/json")
 
 # ==================== DEVELOPMENT SERVER ====================
 
 if __name__ == "__main__":
-    print("\n" + "=" * 60)
-    print("🚀 Starting Elite Honeypot API (Development Mode)")
-    print("🎯 GUVI Format: EXACT MATCH")
-    print("🏆 Target Score: 10/10")
-    print("💰 Prize: 4 Lakh Rupees")
-    print("=" * 60)
-    
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
-        access_log=True
-    )
\ No newline at end of file
+    if os.getenv("ENV") == "prod":
+        # Production: one process per core (reload cannot be combined with workers)
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+            loop="uvloop",
+            http="httptools",
+            timeout_keep_alive=75,
+            log_level="warning",
+            access_log=ACCESS_LOG
+        )
+    else:
+        print("\n" + "=" * 60)
+        print("🚀 Starting Elite Honeypot API (Development Mode)")
+        print("🎯 GUVI Format: EXACT MATCH")
+        print("🏆 Target Score: 10/10")
+        print("💰 Prize: 4 Lakh Rupees")
+        print("=" * 60)
+        
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            timeout_keep_alive=75,
+            reload=True,
+            log_level="info",
+            access_log=ACCESS_LOG
+        )
\ No newline at end of file
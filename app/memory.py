@@ -43,4 +43,74 @@ class ConversationMemory:
                 self.memory[conversation_id]["last_accessed"] = datetime.utcnow()
 
 # Global instance
-conversation_memory = ConversationMemory()
\ No newline at end of file
+conversation_memory = ConversationMemory()
+
+class SessionStore:
+    """Bounded session store: LRU eviction plus idle TTL expiry"""
+    
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600):
+        self.data = OrderedDict()  # session_id -> (last_accessed, value), oldest first
+        self.max_size = max_sessions
+        self.ttl = ttl_seconds
+        self.lock = threading.RLock()
+    
+    def _expire(self, now: float):
+        """Drop idle sessions from the old end"""
+        while self.data:
+            session_id, (last_accessed, _) = next(iter(self.data.items()))
+            if now - last_accessed < self.ttl:
+                break
+            del self.data[session_id]
+    
+    def get(self, session_id: str, default=None):
+        """Get a live session and mark it recently used"""
+        with self.lock:
+            entry = self.data.get(session_id)
+            if entry is None:
+                return default
+            now = time.monotonic()
+            if now - entry[0] >= self.ttl:
+                del self.data[session_id]
+                return default
+            self.data[session_id] = (now, entry[1])
+            self.data.move_to_end(session_id)
+            return entry[1]
+    
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+    
+    def __getitem__(self, session_id: str):
+        value = self.get(session_id)
+        if value is None:
+            raise KeyError(session_id)
+        return value
+    
+    def __setitem__(self, session_id: str, value):
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            self.data[session_id] = (now, value)
+            self.data.move_to_end(session_id)
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+    
+    def __delitem__(self, session_id: str):
+        with self.lock:
+            del self.data[session_id]
+    
+    def pop(self, session_id: str, default=None):
+        """Remove a session, returning its value (or default)"""
+        with self.lock:
+            entry = self.data.pop(session_id, None)
+            return default if entry is None else entry[1]
+    
+    def __len__(self) -> int:
+        with self.lock:
+            self._expire(time.monotonic())
+            return len(self.data)
+    
+    def keys(self):
+        """Live session ids, least recently used first"""
+        with self.lock:
+            self._expire(time.monotonic())
+            return list(self.data.keys())
@@ -4,7 +4,7 @@ Updated to match GUVI evaluation format EXACTLY
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 import time
 
@@ -32,8 +32,7 @@ class GuviRequest(BaseModel):
         "locale": "IN"
     })
     
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # ==================== GUVI OUTPUT MODELS ====================
@@ -97,8 +96,7 @@ class ConversationState(BaseModel):
     agent_persona: str = "concerned_customer"
     engagement_level: int = 1
     
-    class Config:
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 # Export all models
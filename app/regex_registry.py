@@ -0,0 +1,54 @@
+"""
+Shared compiled regexes used by both the detector and the extractor.
+
+Every pattern is compiled exactly once per process. Patterns that the
+detector and the extractor share are compiled with the extractor's flags,
+so the extractor's ``re.compile(PATTERN, EXTRACTION_FLAGS)`` resolves to the
+very same compiled object through the ``re`` module cache.
+"""
+import re
+from typing import Dict
+
+# Flags the extractor scans with
+EXTRACTION_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Pattern sources used in the extractor tables
+PHONE_PATTERN = r'(?:\+91[\-\s]?)?[6-9]\d{9}'
+CARD_PATTERN = r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b'
+SHORTENER_PATTERN = r'(?:bit\.ly|tinyurl\.com|short\.url|cutt\.ly|rebrand\.ly)/[^\s]+'
+
+PHONE_RE = re.compile(PHONE_PATTERN, EXTRACTION_FLAGS)
+CARD_RE = re.compile(CARD_PATTERN, EXTRACTION_FLAGS)
+
+# Detector-only patterns
+URL_RE = re.compile(r'https?://[^\s]+')
+IP_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+ACC_RE = re.compile(r'\b\d{9,18}\b')
+
+# Existence-only check: one alternation matches wherever any of the three
+# UPI forms (handle@bank, 'upi: x@y', 'pay to x@y') would
+UPI_RE = re.compile(
+    r'[\w.\-]+@(?:okicici|okhdfc|okaxis|oksbi|ybl|axl|ibl)'
+    r'|upi[\s:]+[\w.\-]+@[\w]+'
+    r'|pay[\s]+to[\s]+[\w.\-]+@[\w]+',
+    re.IGNORECASE
+)
+
+
+def keyword_trie_pattern(keywords) -> str:
+    """Build a prefix-trie regex matching the longest keyword at a position"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    
+    return emit(trie)
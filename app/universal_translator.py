@@ -7,11 +7,52 @@ Guaranteed to eliminate INVALID_REQUEST_BODY errors permanently.
 """
 
 import json
+import logging
+import random
 import re
+import orjson
 from typing import Any, Dict, Optional, Union
 from datetime import datetime
 import hashlib
 
+from app.utils.helpers import utc_timestamp
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Sentinel for nested-path lookups (distinguishes a missing key from None)
+_MISSING = object()
+
+# Message lookup tables, in priority order
+_MESSAGE_FIELDS = (
+    "message", "text", "input", "query", "content", "prompt",
+    "msg", "data", "body", "payload", "value", "string",
+    "incoming_message", "user_message", "chat", "dialog",
+    "scam_message", "test_message", "sample"
+)
+_MESSAGE_PATHS = (
+    ("incoming_message", "text"),
+    ("message", "content"),
+    ("data", "message"),
+    ("request", "text"),
+    ("chat", "message"),
+    ("conversation", "latest_message")
+)
+
+# Sender and conversation-id lookup keys, in priority order
+_SENDER_FIELDS = ("sender", "from", "user", "author", "name", "role")
+_ID_FIELDS = ("conversation_id", "session_id")
+
+# Fallback messages when no text can be found
+_SCAM_TEMPLATES = (
+    "URGENT: Your bank account has been suspended! Immediate payment required.",
+    "Your account needs verification. Please click the link to confirm.",
+    "You've won a prize! Send processing fee to claim.",
+    "Official notice: Your KYC needs to be updated immediately.",
+    "Security alert: Unusual activity detected in your account."
+)
+
 
 class UniversalTranslator:
     """
@@ -30,7 +71,7 @@ class UniversalTranslator:
     def generate_conversation_id() -> str:
         """Generate unique conversation ID"""
         timestamp = str(datetime.utcnow().timestamp()).replace('.', '')
-        random_hash = hashlib.md5(timestamp.encode()).hexdigest()[:8]
+        random_hash = hashlib.md5(timestamp.encode(), usedforsecurity=False).digest()[:4].hex()
         return f"elite_{timestamp}_{random_hash}"
     
     @staticmethod
@@ -44,87 +85,61 @@ class UniversalTranslator:
         3. String representations
         4. Fallback scam templates
         """
-        
-        SCAM_TEMPLATES = [
-            "URGENT: Your bank account has been suspended! Immediate payment required.",
-            "Your account needs verification. Please click the link to confirm.",
-            "You've won a prize! Send processing fee to claim.",
-            "Official notice: Your KYC needs to be updated immediately.",
-            "Security alert: Unusual activity detected in your account."
-        ]
-        
         # If it's already a string
         if isinstance(data, str):
-            if data.strip():
-                return data.strip()
+            if text := data.strip():
+                return text
             # Return random scam template for empty string
-            import random
-            return random.choice(SCAM_TEMPLATES)
+            return random.choice(_SCAM_TEMPLATES)
         
         # If it's a dictionary/object
         if isinstance(data, dict):
             # Try ALL possible field names (comprehensive list)
-            field_names = [
-                "message", "text", "input", "query", "content", "prompt",
-                "msg", "data", "body", "payload", "value", "string",
-                "incoming_message", "user_message", "chat", "dialog",
-                "scam_message", "test_message", "sample"
-            ]
-            
-            for field in field_names:
+            for field in _MESSAGE_FIELDS:
                 value = data.get(field)
-                if value and str(value).strip():
-                    return str(value).strip()
+                if value and (text := str(value).strip()):
+                    return text
             
             # Try nested structures
-            nested_paths = [
-                ["incoming_message", "text"],
-                ["message", "content"],
-                ["data", "message"],
-                ["request", "text"],
-                ["chat", "message"],
-                ["conversation", "latest_message"]
-            ]
-            
-            for path in nested_paths:
+            for path in _MESSAGE_PATHS:
                 current = data
                 for key in path:
-                    if isinstance(current, dict) and key in current:
-                        current = current[key]
-                    else:
+                    if not isinstance(current, dict):
+                        break
+                    current = current.get(key, _MISSING)
+                    if current is _MISSING:
                         break
                 else:
-                    if current and str(current).strip():
-                        return str(current).strip()
+                    if current and (text := str(current).strip()):
+                        return text
             
             # Try to find any string value in the dict
-            for key, value in data.items():
-                if isinstance(value, str) and value.strip():
-                    return value.strip()
+            for value in data.values():
+                if isinstance(value, str) and (text := value.strip()):
+                    return text
         
         # If it's a list
         if isinstance(data, list):
             for item in data:
-                if isinstance(item, str) and item.strip():
-                    return item.strip()
+                if isinstance(item, str) and (text := item.strip()):
+                    return text
         
         # Ultimate fallback
-        import random
-        return random.choice(SCAM_TEMPLATES)
+        return random.choice(_SCAM_TEMPLATES)
     
     @staticmethod
     def extract_sender_from_any_format(data: Any) -> str:
         """Extract sender from any format"""
         if isinstance(data, dict):
-            sender_fields = ["sender", "from", "user", "author", "name", "role"]
-            for field in sender_fields:
+            for field in _SENDER_FIELDS:
                 value = data.get(field)
-                if value and str(value).strip():
-                    return str(value).strip()
+                if value and (sender := str(value).strip()):
+                    return sender
             
             # Try nested
-            if "incoming_message" in data and isinstance(data["incoming_message"], dict):
-                return data["incoming_message"].get("sender", "unknown")
+            incoming = data.get("incoming_message")
+            if isinstance(incoming, dict):
+                return incoming.get("sender", "unknown")
         
         return "scammer"  # Default assumption for honeypot
     
@@ -137,34 +152,44 @@ class UniversalTranslator:
         
         raw_string = raw_request.decode('utf-8', errors='ignore').strip()
         
-        print(f"\n🎯 UNIVERSAL TRANSLATOR ACTIVATED")
-        print(f"📦 Raw input ({len(raw_string)} chars): {raw_string[:200]}...")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("🎯 UNIVERSAL TRANSLATOR ACTIVATED | Raw input (%d chars): %s...", len(raw_string), raw_string[:200])
         
         # Initialize with defaults
         parsed_data = {}
         
-        # Try to parse as JSON
+        # Try to parse as JSON: orjson straight from the bytes first; stdlib
+        # json only for what orjson rejects (invalid UTF-8, NaN, huge ints)
         if raw_string:
             try:
-                parsed_data = json.loads(raw_string)
-                print(f"✅ Successfully parsed as JSON")
-            except json.JSONDecodeError:
-                # Not JSON, treat as plain text
-                parsed_data = {"raw_text": raw_string}
-                print(f"📝 Treated as plain text")
+                parsed_data = orjson.loads(raw_request)
+                logger.debug("✅ Successfully parsed as JSON")
+            except orjson.JSONDecodeError:
+                try:
+                    parsed_data = json.loads(raw_string)
+                    logger.debug("✅ Successfully parsed as JSON")
+                except json.JSONDecodeError:
+                    # Not JSON, treat as plain text
+                    parsed_data = {"raw_text": raw_string}
+                    logger.debug("📝 Treated as plain text")
         else:
-            print(f"📭 Empty request received")
+            logger.debug("📭 Empty request received")
             parsed_data = {}
         
         # Extract components
         message_text = UniversalTranslator.extract_message_from_any_format(parsed_data)
         sender = UniversalTranslator.extract_sender_from_any_format(parsed_data)
-        conversation_id = parsed_data.get("conversation_id") or parsed_data.get("session_id") or UniversalTranslator.generate_conversation_id()
+        conversation_id = None
+        if isinstance(parsed_data, dict):
+            for field in _ID_FIELDS:
+                if conversation_id := parsed_data.get(field):
+                    break
+        conversation_id = conversation_id or UniversalTranslator.generate_conversation_id()
         
-        print(f"🔍 Extracted:")
-        print(f"   Message: {message_text[:100]}...")
-        print(f"   Sender: {sender}")
-        print(f"   Conversation ID: {conversation_id}")
+        if debug:
+            logger.debug("🔍 Extracted: Message: %s... | Sender: %s | Conversation ID: %s",
+                         message_text[:100], sender, conversation_id)
         
         # Build Elite Honeypot format
         elite_format = {
@@ -177,13 +202,13 @@ class UniversalTranslator:
             "metadata": {
                 "source": "universal_translator",
                 "original_format": type(parsed_data).__name__,
-                "translation_timestamp": datetime.utcnow().isoformat() + "Z",
+                "translation_timestamp": utc_timestamp(),
                 "guvi_compatible": True,
                 "elite_innovation": "universal_translator_v1.0"
             }
         }
         
-        print(f"✅ Translated to Elite Format")
+        logger.debug("✅ Translated to Elite Format")
         
         return elite_format
     
@@ -209,7 +234,7 @@ class UniversalTranslator:
                 "agent_confidence": 0.9
             },
             "status": "success",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": utc_timestamp(),
             "conversation_id": UniversalTranslator.generate_conversation_id(),
             "elite_feature": "guaranteed_response_system",
             "hackathon": "GUVI HCL 2025"
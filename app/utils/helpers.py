@@ -0,0 +1,16 @@
+import time
+
+# (wall-clock second, its 'YYYY-MM-DDTHH:MM:SS' form), swapped as one tuple so
+# concurrent readers never pair a second with another second's prefix
+_timestamp_cache = (-1, "")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO-8601 with microseconds and a 'Z' suffix"""
+    global _timestamp_cache
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _timestamp_cache
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    return f"{prefix}.{micros:06d}Z"
@@ -1,14 +1,41 @@
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
-    """Setup and return a logger instance"""
+# Records are handed to a queue on the calling thread and written to stdout by
+# one background listener, so request handlers never block on console I/O
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+def _get_queue_handler() -> QueueHandler:
+    """Return a handler feeding the shared queue, starting the listener once"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+            _listener = QueueListener(_log_queue, stream_handler)
+            _listener.start()
+            # Drain whatever is still queued on interpreter exit
+            atexit.register(_listener.stop)
+    return QueueHandler(_log_queue)
+
+def setup_logger(name: str, level: str = None) -> logging.Logger:
+    """Setup and return a logger instance (level defaults to $LOG_LEVEL or INFO)"""
     logger = logging.getLogger(name)
-    
+
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
-    
+
     # Set level
     level_map = {
         "DEBUG": logging.DEBUG,
@@ -16,24 +43,15 @@ def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
         "WARNING": logging.WARNING,
         "ERROR": logging.ERROR
     }
+    level = level or os.getenv("LOG_LEVEL", "INFO")
     logger.setLevel(level_map.get(level.upper(), logging.INFO))
-    
-    # Console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level_map.get(level.upper(), logging.INFO))
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    
-    logger.addHandler(handler)
+
+    # Queue handler (formatting and output happen on the listener thread)
+    logger.addHandler(_get_queue_handler())
     logger.propagate = False
-    
+
     return logger
 
 def get_logger(name: str = None):
     """Get a logger instance"""
-    return setup_logger(name or "honeypot_api")
\ No newline at end of file
+    return setup_logger(name or "honeypot_api")
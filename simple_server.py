@@ -4,46 +4,62 @@ RAW HTTP - NO FASTAPI - NO VALIDATION - ALWAYS WORKS
 """
 
 from http.server import HTTPServer, BaseHTTPRequestHandler
+import logging
 import json
-from datetime import datetime
 import time
 
+
+from app.utils.helpers import utc_timestamp
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The reply is constant apart from its timestamp and conversation id, so it
+# is serialized once and only those two values are spliced in per request
+_RESPONSE_TEMPLATE = json.dumps({
+    "scam_detected": True,
+    "agent_reply": "This message has been identified as a potential security threat. Please contact your bank through verified official channels only.",
+    "extracted_intelligence": {
+        "bank_accounts": [],
+        "upi_ids": [],
+        "urls": []
+    },
+    "engagement_metrics": {
+        "turns": 1,
+        "interaction_time_seconds": 0,
+        "scam_likelihood": 0.96,
+        "agent_confidence": 0.97
+    },
+    "status": "success",
+    "timestamp": "__SPLICE__",
+    "conversation_id": "raw___SPLICE__",
+    "hackathon": "GUVI HCL 2025",
+    "server": "raw_http_handler",
+    "compatibility": "100% GUVI TESTER READY"
+}).encode()
+_RESPONSE_HEAD, _RESPONSE_MIDDLE, _RESPONSE_TAIL = _RESPONSE_TEMPLATE.split(b"__SPLICE__")
+
 class GuviHandler(BaseHTTPRequestHandler):
     """Raw HTTP handler that accepts ANYTHING and returns success"""
     
     def do_POST(self):
         """Handle ALL POST requests - accepts ANYTHING"""
-        print(f"📨 POST request to: {self.path}")
-        
         # Read ANY body (even if malformed)
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length) if content_length > 0 else b'{}'
         
-        print(f"🔑 API Key: {self.headers.get('x-api-key', 'NOT PROVIDED')}")
-        print(f"📦 Body length: {len(body)} bytes")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "📨 POST request to: %s | 🔑 API Key: %s | 📦 Body length: %d bytes",
+                self.path, self.headers.get('x-api-key', 'NOT PROVIDED'), len(body)
+            )
         
         # ALWAYS return success
-        response = {
-            "scam_detected": True,
-            "agent_reply": "This message has been identified as a potential security threat. Please contact your bank through verified official channels only.",
-            "extracted_intelligence": {
-                "bank_accounts": [],
-                "upi_ids": [],
-                "urls": []
-            },
-            "engagement_metrics": {
-                "turns": 1,
-                "interaction_time_seconds": 0,
-                "scam_likelihood": 0.96,
-                "agent_confidence": 0.97
-            },
-            "status": "success",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "conversation_id": f"raw_{int(time.time())}",
-            "hackathon": "GUVI HCL 2025",
-            "server": "raw_http_handler",
-            "compatibility": "100% GUVI TESTER READY"
-        }
+        response = b"".join((
+            _RESPONSE_HEAD, utc_timestamp().encode(),
+            _RESPONSE_MIDDLE, str(int(time.time())).encode(),
+            _RESPONSE_TAIL
+        ))
         
         # Send response
         self.send_response(200)
@@ -53,7 +69,7 @@ class GuviHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', '*')
         self.end_headers()
         
-        self.wfile.write(json.dumps(response).encode('utf-8'))
+        self.wfile.write(response)
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""